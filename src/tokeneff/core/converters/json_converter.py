@@ -1,13 +1,21 @@
-import json
 from tokeneff.core.base import BaseConverter
 from tokeneff.core.models import ConversionInput
+from tokeneff.utils.json_utils import loads
+
+# Raw JSON payloads accepted as-is (format="json-bytes"); orjson parses these without a str round-trip
+_RAW_TYPES = (bytes, bytearray, memoryview)
 
 
 class JsonConverter(BaseConverter):
     """Converts JSON data into normalized python dict"""
 
     def parse(self, raw_input: ConversionInput) -> dict:
-        if isinstance(raw_input.data, str):
-            return json.loads(raw_input.data)
+        """
+        Parse JSON text or raw UTF-8 bytes; already-parsed data is returned as-is.
+        The type of `data` decides, so "json" and "json-bytes" are handled alike.
+        """
+        data = raw_input.data
+        if isinstance(data, (str, *_RAW_TYPES)):
+            return loads(data)
 
-        return raw_input.data
+        return data
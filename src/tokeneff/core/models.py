@@ -7,7 +7,7 @@ class ConversionInput:
     """Unify data input model"""
 
     data: Any
-    format: str  # e.g 'json', 'csv', 'yaml', 'dataframe'
+    format: str  # e.g 'json', 'json-bytes', 'csv', 'yaml', 'dataframe'
     options: Optional[Dict[str, Any]] = None
 
 
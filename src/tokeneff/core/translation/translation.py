@@ -1,32 +1,488 @@
-from typing import List, Union, Optional, Iterable
+import asyncio
+import atexit
+import functools
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import sys
+from collections import OrderedDict
+from typing import Any, Collection, Dict, List, Union, Optional, Iterable, Set, Tuple
 from tokeneff.core.translation.languages import Language
 
-try:
-    from googletrans import Translator
-except ImportError:
-    print(
-        "⚠️ googletrans module not found. Install it using:\n    pip install googletrans==4.0.0-rc1"
-    )
-    Translator = None
+logger = logging.getLogger(__name__)
+
+# LRU of (content hash, src, dest) -> translated text
+_TRANSLATE_CACHE: "OrderedDict[Tuple[bytes, str, str], str]" = OrderedDict()
+MAX_CACHE = 2048
+
+# In-flight requests per cache key, so concurrent callers share one call
+_INFLIGHT: Dict[Tuple[bytes, str, str], "asyncio.Future[str]"] = {}
+
+# Opt-in on-disk copy of the cache: a file path, or "1" for $XDG_CACHE_HOME/tokeneff/translations.json
+DISK_CACHE_ENV = "TOKENEFF_TRANSLATE_CACHE"
+_disk_loaded = False
+_disk_dirty = False
+
+
+def _cache_key(text: str, src: str, dest_code: str) -> Tuple[bytes, str, str]:
+    return (hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest(), src, dest_code)
+
+
+def _cache_get(key: Tuple[bytes, str, str]) -> Optional[str]:
+    value = _TRANSLATE_CACHE.get(key)
+    if value is not None:
+        _TRANSLATE_CACHE.move_to_end(key)
+    return value
+
+
+def _cache_put(key: Tuple[bytes, str, str], value: str) -> None:
+    global _disk_dirty
+    _disk_dirty = True
+    _TRANSLATE_CACHE[key] = value
+    _TRANSLATE_CACHE.move_to_end(key)
+    if len(_TRANSLATE_CACHE) > MAX_CACHE:
+        _TRANSLATE_CACHE.popitem(last=False)
+
+
+def _disk_cache_path() -> Optional[str]:
+    value = os.environ.get(DISK_CACHE_ENV)
+    if value in (None, "", "0"):
+        return None
+    if value != "1":
+        return value
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "tokeneff", "translations.json")
+
+
+def _valid_disk_entry(entry: Any) -> bool:
+    # [digest hex, src, dest, translation]
+    if not (isinstance(entry, list) and len(entry) == 4 and all(isinstance(x, str) for x in entry)):
+        return False
+    try:
+        bytes.fromhex(entry[0])
+    except ValueError:
+        return False
+    return True
+
+
+def _read_disk_entries(path: str) -> List[List[str]]:
+    """Well-formed entries of the disk cache at path; malformed rows are skipped."""
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+        if not isinstance(entries, list):
+            raise ValueError("expected a list of entries")
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable translation cache %s: %s", path, e)
+        return []
+    valid = [entry for entry in entries if _valid_disk_entry(entry)]
+    if len(valid) != len(entries):
+        logger.warning("Skipping %d malformed entries in translation cache %s", len(entries) - len(valid), path)
+    return valid
+
+
+def _load_disk_cache() -> None:
+    """Populate the in-memory cache from disk, once per process."""
+    global _disk_loaded
+    if _disk_loaded:
+        return
+    _disk_loaded = True
+    path = _disk_cache_path()
+    if not path:
+        return
+    for digest, src, dest_code, value in _read_disk_entries(path)[-MAX_CACHE:]:
+        _TRANSLATE_CACHE.setdefault((bytes.fromhex(digest), src, dest_code), value)
+
+
+@atexit.register
+def _save_disk_cache() -> None:
+    """Merge new translations into the disk cache at shutdown (entries already on disk are kept)."""
+    global _disk_dirty
+    path = _disk_cache_path()
+    if not _disk_dirty or not path:
+        return
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        merged: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        for digest, src, dest_code, value in _read_disk_entries(path):
+            merged[(digest, src, dest_code)] = value
+        for k, v in _TRANSLATE_CACHE.items():
+            key = (k[0].hex(), k[1], k[2])
+            merged[key] = v
+            merged.move_to_end(key)
+        entries = [[*k, v] for k, v in merged.items()][-MAX_CACHE:]
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        _disk_dirty = False
+    except OSError as e:
+        logger.warning("Could not write translation cache %s: %s", path, e)
+
+
+def cache_clear() -> None:
+    """Drop all in-memory translations; the on-disk cache file is kept but not reloaded."""
+    global _disk_loaded, _disk_dirty
+    _TRANSLATE_CACHE.clear()
+    _disk_loaded = True
+    _disk_dirty = False
 
-# Create global translator instance
-_translator = Translator() if Translator is not None else None
 
+# Max concurrent outbound translate requests
+CONCURRENCY_ENV = "TOKENEFF_TRANSLATE_CONCURRENCY"
+DEFAULT_CONCURRENCY = 8
 
-def _ensure_translator():
-    """Ensure googletrans is available."""
-    if _translator is None:
+# Google endpoint that accepts requests without a TKK token
+TOKEN_FREE_SERVICE_URLS = ("translate.googleapis.com",)
+
+# Connection pool and timeouts (seconds) for the shared HTTP/2 client
+HTTP_MAX_CONNECTIONS = 50
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+HTTP_TIMEOUT = 10.0
+HTTP_CONNECT_TIMEOUT = 3.0
+
+
+# Retries for transient failures (connection errors, timeouts, 429/5xx), with jittered exponential backoff
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 4.0
+RETRY_JITTER = 0.25
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def _transient_errors() -> tuple:
+    # httpx is only imported with the backend; if it isn't loaded, nothing can raise its errors
+    httpx = sys.modules.get("httpx")
+    return (httpx.TransportError,) if httpx is not None else ()
+
+
+def _create_backend():
+    """
+    Import googletrans and create a translator on an HTTP/2 httpx.AsyncClient, so concurrent
+    requests multiplex over one TLS connection (needs the h2 package: pip install httpx[http2],
+    which googletrans already depends on).
+    """
+    try:
+        import httpx
+        from googletrans import Translator as GoogleTranslator
+    except ImportError as e:
         raise RuntimeError(
             "googletrans library is not available. "
             "Install with: pip install googletrans==4.0.0-rc1"
-        )
-    return _translator
+        ) from e
+    # The translate.googleapis.com ("gtx") client needs no auth token. The translate.google.com
+    # webapp client would fetch and refresh a TKK token before requests, an extra round trip.
+    backend = GoogleTranslator(service_urls=TOKEN_FREE_SERVICE_URLS)
+    # googletrans builds its client with http2=True but default limits and no timeout;
+    # swap in a bounded one (its own client hasn't opened a connection yet)
+    client = httpx.AsyncClient(
+        http2=True,
+        headers=backend.client.headers,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+        timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+    )
+    backend.client = client
+    backend.token_acquirer.client = client
+    return backend
+
+
+class Translator:
+    """
+    Shared translation client, reused by every `translate()` call so requests
+    go over one warm connection pool instead of a new TCP + TLS handshake each time.
+
+    The underlying httpx client is bound to the event loop that created it, so a new
+    one is created when `translate()` runs under a different loop (e.g. successive
+    `asyncio.run` calls). Close the pool with `await translator.aclose()` or use
+    `async with translator:`.
+
+    At most `max_concurrency` requests (default: $TOKENEFF_TRANSLATE_CONCURRENCY or 8)
+    are in flight at once, to stay under Google's rate limits.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be >= 1, got {max_concurrency!r}")
+        self._max_concurrency = max_concurrency
+        self._backend = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def max_concurrency(self) -> int:
+        """Explicit limit, else read from the environment on first use (not at import)."""
+        if self._max_concurrency is not None:
+            return self._max_concurrency
+        raw = os.getenv(CONCURRENCY_ENV)
+        if raw is None:
+            return DEFAULT_CONCURRENCY
+        try:
+            value = int(raw)
+        except ValueError:
+            value = 0
+        if value < 1:
+            raise ValueError(f"{CONCURRENCY_ENV} must be an integer >= 1, got {raw!r}")
+        return value
+
+    async def backend(self):
+        """Return the googletrans translator for the running loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # httpx clients and semaphores are bound to one loop
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._backend = None
+            self._loop = loop
+        if self._backend is None:
+            # no await between the check and the assignment, so concurrent callers can't double-init
+            self._backend = _create_backend()
+        return self._backend
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        """Semaphore bounding concurrent requests on the current loop (call `backend()` first)."""
+        return self._slots
+
+    async def aclose(self) -> None:
+        """Close the connection pool; the next call opens a new one."""
+        backend, self._backend = self._backend, None
+        if backend is not None and self._loop is asyncio.get_running_loop():
+            await backend.client.aclose()
+        self._loop = None
+
+    async def __aenter__(self) -> "Translator":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.aclose()
+
+
+# Create global translator instance
+translator = Translator()
+
+
+def _valid_utf8(text: str) -> bool:
+    """True if text encodes to UTF-8; JSON \\u escapes can decode to lone surrogates that don't."""
+    if text.isascii():
+        return True
+    try:
+        text.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _retry_delay(attempt: int) -> float:
+    return min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY) + random.uniform(0, RETRY_JITTER)
+
+
+async def _request(text: str, src: str, dest_code: str) -> str:
+    """One googletrans round trip for a single string, retrying transient failures on the same client."""
+    backend = await translator.backend()
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            async with translator.slots:
+                result = await backend.translate(text, src=src, dest=dest_code)
+        except _transient_errors() as e:
+            error: Exception = e
+        else:
+            # googletrans echoes the input on a non-200 response instead of raising
+            status = getattr(getattr(result, "_response", None), "status_code", None)
+            if status is None or status == 200:
+                break
+            error = RuntimeError(f"Translate request failed with HTTP {status}")
+            if status not in RETRY_STATUS_CODES:
+                # 4xx (including 401/403) won't succeed on retry; the gtx endpoint has no token to refresh
+                raise error
+        if attempt + 1 == RETRY_ATTEMPTS:
+            raise error
+        # back off outside the semaphore so waiting doesn't hold a request slot
+        await asyncio.sleep(_retry_delay(attempt))
+
+    translated = result.text if hasattr(result, "text") else str(result)
+    # reject it here, before it reaches the cache, the chunk joiner or the tokenizer
+    if not _valid_utf8(translated):
+        raise ValueError("Translation response is not valid UTF-8")
+    return translated
+
+
+class BatchQueue:
+    """
+    Coalesces translate requests that arrive within `window` seconds into one
+    newline-joined request per (src, dest), up to `max_items` strings / `max_chars` characters.
+
+    Strings that contain a newline can't be split back out of a joined response,
+    so they skip the queue and are sent directly. If a joined response doesn't split
+    back into one line per input, its strings are retried individually; if the joined
+    request itself fails (after `_request`'s retries), every string in it gets that error.
+    """
+
+    def __init__(self, max_items: int = 64, max_chars: int = 5000, window: float = 0.005):
+        self.max_items = max_items
+        self.max_chars = max_chars
+        self.window = window
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # strong references to send tasks, the loop only keeps weak ones
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, text: str, src: str, dest_code: str) -> str:
+        """Queue one string and wait for its translation."""
+        if "\n" in text:
+            # can't be coalesced, don't make it wait out the window
+            return await _request(text, src, dest_code)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            # queues and tasks belong to one loop, start a fresh worker per loop
+            self._queue = asyncio.Queue()
+            self._tasks = set()
+            self._loop = loop
+            self._worker = loop.create_task(self._run())
+        fut = loop.create_future()
+        self._queue.put_nowait((text, src, dest_code, fut))
+        return await fut
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        carry = None
+        while True:
+            item = carry if carry is not None else await queue.get()
+            carry = None
+            batch = [item]
+            chars = len(item[0])
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_items:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if chars + len(item[0]) > self.max_chars:
+                    # over budget, it opens the next batch
+                    carry = item
+                    break
+                batch.append(item)
+                chars += len(item[0])
+
+            groups: Dict[Tuple[str, str], list] = {}
+            for item in batch:
+                groups.setdefault((item[1], item[2]), []).append(item)
+            for (src, dest_code), items in groups.items():
+                # send without blocking the worker so the next batch keeps filling
+                task = loop.create_task(self._send(items, src, dest_code))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, items: list, src: str, dest_code: str) -> None:
+        singles = []
+        if len(items) > 1:
+            try:
+                joined = await _request("\n".join(it[0] for it in items), src, dest_code)
+            except Exception as e:
+                # _request already retried transient errors; re-sending each item would only multiply load
+                for it in items:
+                    if not it[3].done():
+                        it[3].set_exception(e)
+                return
+            parts = joined.split("\n")
+            if len(parts) == len(items):
+                for it, part in zip(items, parts):
+                    if not it[3].done():
+                        it[3].set_result(part)
+            else:
+                # the response doesn't split back per input: per-item requests
+                singles = items
+        else:
+            singles = items
+
+        async def _one(it) -> None:
+            try:
+                result = await _request(it[0], src, dest_code)
+            except Exception as e:
+                if not it[3].done():
+                    it[3].set_exception(e)
+            else:
+                if not it[3].done():
+                    it[3].set_result(result)
+
+        await asyncio.gather(*(_one(it) for it in singles))
+
+
+_batch_queue = BatchQueue()
+
+
+def _inflight_done(key: Tuple[bytes, str, str], fut: "asyncio.Future[str]") -> None:
+    if _INFLIGHT.get(key) is fut:
+        del _INFLIGHT[key]
+    # failed requests (including googletrans' echoed non-200 responses) end up as exceptions here
+    if fut.cancelled() or fut.exception() is not None:
+        return
+    _cache_put(key, fut.result())
+
+
+async def _fetch(key: Tuple[bytes, str, str], text: str, src: str, dest_code: str) -> str:
+    """Translate one cache miss, joining an identical request already in flight."""
+    fut = _INFLIGHT.get(key)
+    if fut is None or fut.get_loop() is not asyncio.get_running_loop():
+        fut = asyncio.ensure_future(_batch_queue.submit(text, src, dest_code))
+        _INFLIGHT[key] = fut
+        fut.add_done_callback(functools.partial(_inflight_done, key))
+    # shield: one caller being cancelled must not cancel the shared request
+    return await asyncio.shield(fut)
+
+
+# Any letter, in any script (so not a digit, underscore, punctuation or whitespace)
+_LETTER_RE = re.compile(r"[^\W\d_]")
+_URL_RE = re.compile(r"^\s*[a-zA-Z][a-zA-Z0-9+.-]*://\S+\s*$")
+# Letters of scripts written by exactly one destination language. Shared scripts (Han, Cyrillic,
+# Arabic, Devanagari, Latin) are left out: Traditional Chinese, Ukrainian, Persian or Marathi
+# text is in the same script as zh-cn, ru, ar or hi and still needs translating.
+_DEST_SCRIPT_RE = {
+    Language.KOREAN.value: re.compile(r"[\u1100-\u11ff\u3130-\u318f\uac00-\ud7af]"),
+}
+
+
+def _needs_translation(s: str, dest_code: str, keep: Collection[str] = ()) -> bool:
+    """False for text translation can't change: no letters, a bare URL, or already in a dest-only script."""
+    if s in keep or not _LETTER_RE.search(s) or _URL_RE.match(s):
+        return False
+    script_re = _DEST_SCRIPT_RE.get(dest_code)
+    # every letter belongs to a script only the destination language uses
+    if script_re is not None and not _LETTER_RE.search(script_re.sub("", s)):
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=64)
+def _dest_code(dest: Union[str, Language]) -> str:
+    """ISO code for a Language member, a language name ("chinese") or a raw code, resolved once per value."""
+    if isinstance(dest, Language):
+        return dest.value
+    try:
+        return Language.from_name(dest).value
+    except Exception:
+        return str(dest)
 
 
 def _normalize_input(text_or_list: Union[str, Iterable[str]]):
-    """Normalize input into list form."""
+    """Normalize input into an indexable sequence; lists and tuples pass through without a copy."""
     if isinstance(text_or_list, str):
         return [text_or_list], True
+    if isinstance(text_or_list, (list, tuple)):
+        return text_or_list, False
 
     return list(text_or_list), False
 
@@ -37,50 +493,75 @@ async def translate(
     dest: Union[str, Language] = Language.CHINESE,
     *,
     raise_on_error: bool = False,
+    keep: Collection[str] = (),
 ) -> Union[str, List[str]]:
     """
     Asynchronously translate text or list of texts to another language.
 
+    Strings without letters (numbers, punctuation), bare URLs, Hangul-only text
+    bound for Korean and anything in `keep` are returned unchanged without a request.
+
     Args:
         text_or_list: A single string or iterable of strings.
         src: Source language (default: auto-detect).
         dest: Destination language (Language enum or str, default: Language.CHINESE).
-        raise_on_error: Raise exception if translation fails.
+        raise_on_error: Raise the first failure instead of keeping the original text of strings that failed.
+        keep: Strings never to translate (e.g. proper nouns).
 
     Returns:
         Translated string or list of strings.
     """
-    translator = _ensure_translator()
     texts, single = _normalize_input(text_or_list)
 
     # Resolve language enum or string
-    if isinstance(dest, Language):
-        dest_code = dest.value
-    else:
-        try:
-            dest_code = Language.from_name(dest).value
-        except Exception:
-            dest_code = str(dest)
+    dest_code = _dest_code(dest)
 
-    try:
-        # googletrans Translator.translate is a coroutine
-        result = await translator.translate(texts, src=src, dest=dest_code)
-
-        # Handle single or multiple translations
-        if len(texts) == 1:
-            if hasattr(result, "text"):
-                translated = result.text
-            elif isinstance(result, list):
-                translated = result[0].text
-            else:
-                translated = str(result)
+    # Serve repeated texts from the cache, only cache misses go to the backend
+    _load_disk_cache()
+    translated: List[Optional[str]] = [None] * len(texts)
+    keys: List[Optional[Tuple[bytes, str, str]]] = [None] * len(texts)
+    misses: List[int] = []
+    # module-level helpers bound to locals: the loop runs once per input string
+    needs_translation, cache_key, cache_get = _needs_translation, _cache_key, _cache_get
+    for i, t in enumerate(texts):
+        if not needs_translation(t, dest_code, keep):
+            translated[i] = t
+            continue
+        key = cache_key(t, src, dest_code)
+        keys[i] = key
+        value = cache_get(key)
+        if value is None:
+            misses.append(i)
+        else:
+            translated[i] = value
+    if not misses:
+        return translated[0] if single else translated
+
+    # fail loudly if googletrans is missing rather than silently returning the input
+    await translator.backend()
+    # concurrent callers' strings are coalesced into shared requests by the batch queue;
+    # a string that fails keeps its original text without discarding the ones that succeeded
+    results = await asyncio.gather(
+        *(_fetch(keys[i], texts[i], src, dest_code) for i in misses),
+        return_exceptions=True,
+    )
+    failed: List[BaseException] = []
+    for i, result in zip(misses, results):
+        if isinstance(result, BaseException):
+            if raise_on_error or isinstance(result, asyncio.CancelledError):
+                raise result
+            failed.append(result)
+            translated[i] = texts[i]
         else:
-            translated = [r.text for r in result]
+            translated[i] = result
+    if failed:
+        logger.warning(
+            "%d of %d translations failed, keeping their original text. Error: %s",
+            len(failed), len(misses), failed[-1],
+        )
+
+    # A list input always gets a list back, even with a single element
+    return translated[0] if single else translated
 
-        return translated if not single else translated
 
-    except Exception as e:
-        if raise_on_error:
-            raise
-        # fallback: return original input
-        return text_or_list
+translate.cache_clear = cache_clear
@@ -1,10 +1,16 @@
+import asyncio
 import logging
 import math
+import operator
+import re
 import textwrap
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from tokeneff.core.base import BaseFormatter
-from tokeneff.core.models import ConversionOutput
+from tokeneff.core.converters.json_converter import _RAW_TYPES, JsonConverter
+from tokeneff.core.models import ConversionInput, ConversionOutput
+from tokeneff.utils.json_utils import dumps as json_dumps
 from tokeneff.utils.tokenizer_utils import count_tokens
 from tokeneff.core.translation.languages import Language
 
@@ -15,6 +21,111 @@ except Exception:
 
 logger = logging.getLogger(__name__)
 
+
+# characters that force quoting or escaping besides the delimiter: ':', '\n', '\r', '"', '\\'
+_QUOTE_CHARS = ':\n\r"\\'
+
+# ConversionInput formats `format()` parses itself
+_JSON_FORMATS = ("json", "json-bytes")
+_json_converter = JsonConverter()
+
+
+def _parse_input(raw: ConversionInput) -> Any:
+    if raw.format not in _JSON_FORMATS:
+        raise ValueError(f"ToonFormatter can only parse JSON input, got format={raw.format!r}")
+
+    return _json_converter.parse(raw)
+
+
+def _fast_bool(b: bool) -> str:
+    return "true" if b else "false"
+
+
+def _fast_null(_: None) -> str:
+    return "null"
+
+
+async def _translate_texts(texts: List[str], dest: Any) -> List[str]:
+    """Translate texts, keeping the original of any that fail; errors are logged, never raised"""
+    try:
+        results = await translate(texts, dest=dest)
+    except Exception as e:
+        # e.g. googletrans not installed
+        logger.warning("Translation failed; using untranslated text. Error: %s", e)
+        return list(texts)
+
+    return list(results)
+
+
+def _collect_str_leaves(obj: Any, leaves: Dict[str, None]) -> None:
+    """Unique string values of a nested structure (keys excluded), in first-seen order"""
+    if isinstance(obj, str):
+        leaves[obj] = None
+    elif isinstance(obj, dict):
+        for v in obj.values():
+            _collect_str_leaves(v, leaves)
+    elif isinstance(obj, (list, tuple)):
+        for v in obj:
+            _collect_str_leaves(v, leaves)
+
+
+def _replace_str_leaves(obj: Any, mapping: Dict[str, str]) -> Any:
+    """Copy of `obj` with every string value looked up in `mapping`; keys are kept"""
+    if isinstance(obj, str):
+        return mapping.get(obj, obj)
+    if isinstance(obj, dict):
+        return {k: _replace_str_leaves(v, mapping) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_replace_str_leaves(v, mapping) for v in obj]
+
+    return obj
+
+
+def _schema_key(node: Any) -> Any:
+    """Hashable shape of a sample document: dict keys (recursively) and leaf types"""
+    if isinstance(node, dict):
+        return (dict, tuple((k if isinstance(k, str) else repr(k), _schema_key(v)) for k, v in node.items()))
+    if isinstance(node, list):
+        return list
+
+    return type(node)
+
+
+# Leaf type in a schema -> (exact-type guard, rendering) expressions for `ToonFormatter.compile`
+_LEAF_WRITERS = {
+    str: ("type({v}) is str", "_esc({v})"),
+    int: ("type({v}) is int", "str({v})"),
+    bool: ("type({v}) is bool", "('true' if {v} else 'false')"),
+    float: ("type({v}) is float", "_prim({v})"),
+    type(None): ("{v} is None", "'null'"),
+}
+
+
+def _classify_array(arr: List[Any]) -> Optional[Tuple[Any, ...]]:
+    """
+    Single pass check for a uniform array of objects (same keys, primitive values)
+
+    Return:
+        the shared keys in first-item order, or None if the array cannot be tabular
+    """
+    if not arr or not isinstance(arr[0], dict):
+        return None
+
+    keys = tuple(arr[0].keys())
+    klen = len(keys)
+    for x in arr:
+        if not isinstance(x, dict) or len(x) != klen:
+            return None
+        for k in keys:
+            if k not in x:
+                return None
+            v = x[k]
+            if v is not None and not isinstance(v, (str, bool, int, float)):
+                return None
+
+    return keys
+
+
 class ToonFormatter(BaseFormatter):
     """
     Enhanced TOON formatter implementing:
@@ -25,30 +136,63 @@ class ToonFormatter(BaseFormatter):
         - configurable delimiter / indent / key folding
         - Async translation with batching
     """
-    # Max characters per translation chunk (heuristic)
+    # Max UTF-8 bytes per translation chunk (heuristic)
     TRANSLATE_CHUNK_SIZE = 4000
+    # Number of (delimiter, indent) combinations whose precomputed state is kept
+    STATE_CACHE_SIZE = 8
+    # Rendered keys remembered across calls per state; longer keys are rendered every time
+    KEY_CACHE_SIZE = 2048
+    KEY_CACHE_MAX_LEN = 64
+    # Number of schema-specialized writers kept by `compile`
+    COMPILE_CACHE_SIZE = 32
+    # Levels of nested dicts inlined by `compile`; deeper ones use the generic writer (each level nests
+    # one `if`, and CPython rejects code indented ~100 levels deep)
+    COMPILE_MAX_DEPTH = 32
 
-    async def format(self, data: dict, **options) -> ConversionOutput:
-        """
-        Format the normalized data into TOON
-        Options:
-            - delimiter: str, default: ","
-            - indent: int spaces for nested levels (default: 2)
-            - key_folding: bool (default False)
-                * Fold single-key chains into dotted keys when safe
-            - translate_to / translate: Language or str (optional)
-            - strict_fallback: "json" | "compact" | None - If structure unsupported, fallback behaviour
+    def __init__(self):
+        self._cache: "OrderedDict[Tuple[str, int], Dict[str, Any]]" = OrderedDict()
+        self._compiled: "OrderedDict[Tuple[Any, ...], Callable[[Any], str]]" = OrderedDict()
 
-        ```python
-        >>> fmt = ToonFormater()
-        >>> out = await fmt.format(data, translate_to=Language.CHINESE)
-        ```
-        """
-        delimiter: str = options.get("delimiter", ",")
-        indent: int = options.get("indent", 2)
-        key_folding: bool = bool(options.get("key_folding", False))
-        strict_fallback: Optional[str] = options.get("strict_fallback", None)
+    def _get_state(self, delimiter: str, indent: int) -> Dict[str, Any]:
+        """Per (delimiter, indent) invariants: quoting regex, escape table and indentation strings"""
+        key = (delimiter, indent)
+        state = self._cache.get(key)
+        if state is not None:
+            self._cache.move_to_end(key)
+            return state
+
+        if len(delimiter) == 1:
+            needs_quote_re = re.compile(f"[{re.escape(_QUOTE_CHARS + delimiter)}]")
+        else:
+            needs_quote_re = re.compile(f"[{re.escape(_QUOTE_CHARS)}]|{re.escape(delimiter)}")
+
+        quoted_tbl = None
+        if len(delimiter) == 1 and delimiter not in _QUOTE_CHARS:
+            # one C-level pass: backslash, colon, delimiter, newline/carriage return and internal double quotes
+            quoted_tbl = str.maketrans({
+                "\\": "\\\\",
+                ":": "\\:",
+                delimiter: "\\" + delimiter,
+                "\n": "\\n",
+                "\r": "\\r",
+                '"': '\\"',
+            })
 
+        state = {
+            "needs_quote_re": needs_quote_re,
+            "quoted_tbl": quoted_tbl,
+            # indentation strings per nesting level, grown on demand
+            "indents": [" " * (indent * i) for i in range(16)],
+            # key -> rendered key, shared by every call with this delimiter
+            "keys": {},
+        }
+        self._cache[key] = state
+        if len(self._cache) > self.STATE_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return state
+
+    def _writers(self, delimiter: str, indent: int, key_folding: bool) -> Dict[str, Any]:
+        """TOON writer closures for one set of layout options, shared by `format` and `compile`"""
         def _is_primitive(v: Any) -> bool:
             return v is None or isinstance(v, (str, bool, int, float))
         
@@ -59,27 +203,59 @@ class ToonFormatter(BaseFormatter):
 
             return s.replace("_", "a").isalnum() and (s[0].isalpha() or s[0] == "_")
         
-        def _escape_and_quote_string(s: str) -> str:
-            # characters that force quoting or escaping: delimiter, ':', '\n', '\r', '"'
-            special_chars = {delimiter, ":", "\n", "\r", '"', "\\"}
-            esc = s.replace("\\", "\\\\")
-            # escape delimiter and colon and newline/carriage return
-            esc = esc.replace(":", "\\:").replace(delimiter, "\\" + delimiter)
-            esc = esc.replace("\n", "\\n").replace("\r", "\\r")
+        state = self._get_state(delimiter, indent)
+        _needs_quote_re = state["needs_quote_re"]
+        _quoted_tbl = state["quoted_tbl"]
+        indents: List[str] = state["indents"]
+        _key_cache: Dict[str, str] = state["keys"]
+        key_cache_size = self.KEY_CACHE_SIZE
+        key_cache_max_len = self.KEY_CACHE_MAX_LEN
+
+        def _key_repr(k: str) -> str:
+            r = _key_cache.get(k)
+            if r is None:
+                # safe key escaping: keys should be safe identifiers in many examples, else quote
+                r = k if _valid_identifier(k) else _escape_and_quote_string(k)
+                if isinstance(k, str) and len(k) <= key_cache_max_len:
+                    if len(_key_cache) >= key_cache_size:
+                        # evict the oldest entry (dicts keep insertion order)
+                        del _key_cache[next(iter(_key_cache))]
+                    _key_cache[k] = r
+            return r
+
+        def _needs_quote(s: str) -> bool:
             # if there are leading/trailing spaces or any unsafe chars, quote
-            needs_quote = (
-                s.startswith(" ")
-                or s.endswith(" ")
-                or any(ch in s for ch in special_chars)
-                or len(s) == 0
-            )
-            if needs_quote:
-                # escape internal double quotes
-                esc = esc.replace('"', '\\"')
-                return f'"{esc}"'
-            
-            return esc
-        
+            return not s or s[0] == " " or s[-1] == " " or _needs_quote_re.search(s) is not None
+
+        if _quoted_tbl is not None:
+            def _escape_quoted(s: str) -> str:
+                return s.translate(_quoted_tbl)
+        else:
+            # multi-char delimiters or ones overlapping the escape set keep the sequential replaces
+            def _escape_quoted(s: str) -> str:
+                esc = s.replace("\\", "\\\\")
+                esc = esc.replace(":", "\\:").replace(delimiter, "\\" + delimiter)
+                esc = esc.replace("\n", "\\n").replace("\r", "\\r")
+                return esc.replace('"', '\\"')
+
+        def _escape_and_quote_string(s: str) -> str:
+            # strings that need no quoting contain nothing to escape either
+            if not _needs_quote(s):
+                return s
+
+            return f'"{_escape_quoted(s)}"'
+
+        def _all_plain(strs: List[str]) -> bool:
+            """True when no string needs quoting, checked with one regex scan over the whole batch"""
+            # NUL separates the strings; a NUL inside one only makes the check fail safe
+            joined = "\0".join(strs)
+            if not joined or joined[0] in " \0" or joined[-1] in " \0":
+                return False
+            if "\0\0" in joined or "\0 " in joined or " \0" in joined:
+                return False
+
+            return _needs_quote_re.search(joined) is None
+
         def _compact_primitive(v: Any) -> str:
             if v is None:
                 return "null"
@@ -88,176 +264,351 @@ class ToonFormatter(BaseFormatter):
             if isinstance(v, int):
                 return str(v)
             if isinstance(v, float):
-                s = repr(v)
-                # remove trailing .0
-                if s.endswith('.0'):
-                    s = s[:-2]
+                # NaN / +-inf have no TOON number form, normalize to null like toon-ts
+                if not math.isfinite(v):
+                    return "null"
+                # integral floats (ids, counts) print without the trailing .0
+                if v.is_integer() and -1e16 < v < 1e16:
+                    return str(int(v))
 
-                return s
+                return repr(v)
             
             return _escape_and_quote_string(v)
+
+        # Exact column type -> specialized cell writer (bool is checked by identity, not as int)
+        typed_writers = {int: str, bool: _fast_bool, str: _escape_and_quote_string, type(None): _fast_null}
         
         def _is_uniform_array_of_primitives(arr: List[Any]) -> bool:
             return all(_is_primitive(x) for x in arr)
+
+        def _join_primitives(arr: List[Any]) -> str:
+            # homogeneous lists join through map() with the specialized writer (all C-level for ints)
+            kinds = set(map(type, arr))
+            kind = kinds.pop() if len(kinds) == 1 else None
+            if kind is str and _all_plain(arr):
+                return delimiter.join(arr)
+            fn = typed_writers.get(kind)
+            return delimiter.join(map(fn or _compact_primitive, arr))
         
-        def _is_uniform_array_of_objects(arr: List[Any]) -> bool:
-            if not arr:
-                return False
-            if not all(isinstance(x, dict) for x in arr):
-                return False
+        def _indent(level: int) -> str:
+            while level >= len(indents):
+                indents.append(" " * (indent * len(indents)))
+            return indents[level]
 
-            # All items must have same keys
-            keyset = set(arr[0].keys())
-            if any(set(x.keys()) != keyset for x in arr):
-                return False
-            # And values for each item must be primitives
+        def _emit_table(
+            arr: List[Dict[str, Any]], fields: Tuple[Any, ...], level: int, header_end: str, out: List[str]
+        ) -> None:
+            # `{f1,f2}` field header followed by one delimited row per item
+            fields_repr = [_key_repr(f) for f in fields]
+            field_getters = [operator.itemgetter(f) for f in fields]
+            # Specialize each column when all of its cells share one exact type
+            columns = []
+            for g in field_getters:
+                col_types = set(map(type, map(g, arr)))
+                kind = col_types.pop() if len(col_types) == 1 else None
+                # str() hands back plain str cells unchanged
+                fn = str if kind is str and _all_plain(list(map(g, arr))) else typed_writers.get(kind)
+                columns.append((fn or _compact_primitive, g))
+            out.append(f"{{{','.join(fields_repr)}}}")
+            out.append(header_end)
+            sp = _indent(level)
             for item in arr:
-                for v in item.values():
-                    if not _is_primitive(v):
-                        return False
-            
-            return True
-        
-        def _fold_keys(obj: Any, prefix: Optional[str] = None) -> (str, Any): # type: ignore
-            """
-            If key_folding enabled and obj is nested single-key chains, 
-            
-            Return:
-                (folded_key, value)
-            If cannot fold, returns (prefix, old)
-            """
-            cur = obj
-            keys = []
-            while isinstance(cur, dict) and len(cur) == 1:
-                k = next(iter(cur.keys()))
-                if not _valid_identifier(k):
-                    break
-                keys.append(k)
-                cur = cur[k]
-            
-            if prefix:
-                keyname = f"{prefix}." + ".".join(keys) if keys else prefix
-            else:
-                keyname = ".".join(keys) if keys else None
+                out.append(sp)
+                out.append(delimiter.join([fn(g(item)) for fn, g in columns]))
+                out.append("\n")
 
-            return keyname, cur
+        def _emit_items(items: List[Any], level: int, out: List[str]) -> None:
+            # mixed or nested lists: each element on its own line, prefixed with '- '
+            sp = _indent(level)
+            for el in items:
+                out.append(sp)
+                out.append("- ")
+                if _is_primitive(el):
+                    out.append(_compact_primitive(el))
+                    out.append("\n")
+                else:
+                    mark = len(out)
+                    _emit(el, level + 1, None, out)
+                    if len(out) == mark:
+                        out.append("\n")
 
-        def _compact(obj: Any, level: int = 0, parent_key: Optional[str] = None) -> str:
-            sp = " " * (indent * level)
+        def _emit_kv(k: str, key_repr: str, v: Any, level: int, out: List[str]) -> None:
+            """Append one `key: value` entry of an object at the given level"""
+            sp = _indent(level)
+            if isinstance(v, list):
+                # handle lists specially to include length and possible tabular representation
+                if (fields := _classify_array(v)) is not None:
+                    # tabular form header: key[length]{f1,f2}
+                    out.append(sp)
+                    out.append(key_repr)
+                    out.append(f"[{len(v)}]")
+                    _emit_table(v, fields, level + 1, "\n", out)
+                elif _is_uniform_array_of_primitives(v):
+                    # primitive list inline after header
+                    out.append(sp)
+                    out.append(key_repr)
+                    out.append(f"[{len(v)}]: ")
+                    out.append(_join_primitives(v))
+                    out.append("\n")
+                else:
+                    out.append(sp)
+                    out.append(key_repr)
+                    out.append(f"[{len(v)}]:\n")
+                    _emit_items(v, level + 1, out)
+
+            elif isinstance(v, dict):
+                out.append(sp)
+                out.append(key_repr)
+                out.append(":\n")
+                # nested object -> increased level, already emitted with its own indentation
+                _emit(v, level + 1, k, out)
+            else:
+                # primitive
+                out.append(sp)
+                out.append(key_repr)
+                out.append(": ")
+                out.append(_compact_primitive(v))
+                out.append("\n")
+
+        def _emit(obj: Any, level: int, parent_key: Optional[str], out: List[str]) -> None:
+            """Append the TOON lines of obj to out, each terminated by a newline"""
+            sp = _indent(level)
             # Objects
             if isinstance(obj, dict):
-                lines: List[str] = []
-                # Optionally fold single-key chains
-                if key_folding:
-                    folded_key, folded_val = _fold_keys(obj)
-                    if folded_key and folded_val is not obj:
-                        # folded_key becomes an effective "parent" and we continue formatting folded_val
-                        return _compact({folded_key: folded_val}, level, parent_key)
+                # Optionally fold single-key chains into one dotted key, e.g. a.b.c: 1
+                if key_folding and len(obj) == 1:
+                    chain: List[str] = []
+                    cur = obj
+                    while isinstance(cur, dict) and len(cur) == 1:
+                        k = next(iter(cur))
+                        if not _valid_identifier(k):
+                            break
+                        chain.append(k)
+                        cur = cur[k]
+                    if len(chain) > 1:
+                        dotted = ".".join(chain)
+                        _emit_kv(dotted, dotted, cur, level, out)
+                        return
 
                 for k, v in obj.items():
-                    # safe key escaping: keys should be safe identifiers in many examples, else quote
-                    if isinstance(k, str) and _valid_identifier(k):
-                        key_repr = k
-                    else:
-                        key_repr = _escape_and_quote_string(k)
-
-                    if isinstance(v, list):
-                        # handle lists specially to include length and possible tabular representation
-                        if _is_uniform_array_of_objects(v):
-                            # tabular form header: key[length]{f1,f2}:
-                            length = len(v)
-                            fields = list(v[0].keys())
-                            header = f"{sp}{key_repr}[{length}]{{{','.join(fields)}}}"
-                            rows = []
-                            for item in v:
-                                cells = [_compact_primitive(item[f]) for f in fields]
-                                rows.append(" " * (indent * (level + 1)) + delimiter.join(cells))
-                            lines.append(header)
-                            lines.extend(rows)
-                        elif _is_uniform_array_of_primitives(v):
-                            # primitive list inline after header
-                            length = len(v)
-                            header = f"{sp}{key_repr}[{length}]: {delimiter.join(_compact_primitive(x) for x in v)}"
-                            lines.append(header)
-                        else:
-                            # mixed or nested lists: expand each element with dash / nested handling
-                            length = len(v)
-                            lines.append(f"{sp}{key_repr}[{length}]:")
-                            for el in v:
-                                # represent each on its own line, prefixed with '- '
-                                # primitive items become inline
-                                if _is_primitive(el):
-                                    lines.append(" " * (indent * (level + 1)) + "- " + _compact_primitive(el))
-                                else:
-                                    lines.append(" " * (indent * (level + 1)) + "- " + _compact(el, level + 2))
-
-                    elif isinstance(v, dict):
-                        lines.append(f"{sp}{key_repr}:")
-                        # nested object -> increased level
-                        nested = _compact(v, level + 1)
-                        # if nested does not already contain leading spaces, indent it
-                        nested_lines = nested.splitlines()
-                        for ln in nested_lines:
-                            if ln.strip() == "":
-                                lines.append(" " * (indent * (level + 1)) + ln)
-                            else:
-                                lines.append(ln if ln.startswith(" " * (indent * (level + 1))) else " " * (indent * (level + 1)) + ln)
-                    else:
-                        # primitive
-                        lines.append(f"{sp}{key_repr}: {_compact_primitive(v)}")
-
-                return "\n".join(lines)
+                    _emit_kv(k, _key_repr(k), v, level, out)
+                return
 
             # List at the top level
             if isinstance(obj, list):
-                if _is_uniform_array_of_objects(obj):
-                    length = len(obj)
-                    fields = list(obj[0].keys())
-                    header = f"{sp}[{length}]{{{','.join(fields)}}}:"
-                    rows = []
-                    for item in obj:
-                        cells = [_compact_primitive(item[f]) for f in fields]
-                        rows.append(" " * (indent * (level + 1)) + delimiter.join(cells))
-                    return header + "\n" + "\n".join(rows)
+                if (fields := _classify_array(obj)) is not None:
+                    out.append(sp)
+                    out.append(f"[{len(obj)}]")
+                    _emit_table(obj, fields, level + 1, ":\n", out)
                 elif _is_uniform_array_of_primitives(obj):
-                    return f"{sp}[{len(obj)}]: " + delimiter.join(_compact_primitive(x) for x in obj)
+                    out.append(sp)
+                    out.append(f"[{len(obj)}]: ")
+                    out.append(_join_primitives(obj))
+                    out.append("\n")
                 else:
-                    out_lines = [f"{sp}[{len(obj)}]:"]
-                    for el in obj:
-                        if _is_primitive(el):
-                            out_lines.append(" " * (indent * (level + 1)) + "- " + _compact_primitive(el))
-                        else:
-                            out_lines.append(" " * (indent * (level + 1)) + "- " + _compact(el, level + 2))
-
-                    return "\n".join(out_lines)
+                    out.append(sp)
+                    out.append(f"[{len(obj)}]:\n")
+                    _emit_items(obj, level + 1, out)
+                return
 
             # Primitives at the top level
-            return _compact_primitive(obj)
+            out.append(_compact_primitive(obj))
+            out.append("\n")
+
+        def _compact_oneline(o: Any, out: List[str]) -> None:
+            """Append a single-line `k:v,k:[a,b]` rendering of o, used by strict_fallback='compact'"""
+            if isinstance(o, dict):
+                first = True
+                for k, v in o.items():
+                    if not first:
+                        out.append(",")
+                    first = False
+                    out.append(f"{k}:")
+                    _compact_oneline(v, out)
+            elif isinstance(o, list):
+                out.append("[")
+                for i, x in enumerate(o):
+                    if i:
+                        out.append(",")
+                    _compact_oneline(x, out)
+                out.append("]")
+            else:
+                out.append(str(o))
+
+        return {
+            "emit": _emit,
+            "emit_kv": _emit_kv,
+            "compact_oneline": _compact_oneline,
+            "compact_primitive": _compact_primitive,
+            "escape": _escape_and_quote_string,
+            "key_repr": _key_repr,
+        }
+
+    def compile(self, schema: Any, **options) -> Callable[[Any], str]:
+        """
+        Generate a TOON writer specialized for documents shaped like `schema` (a sample document)
+        Keys and indentation are inlined as literals and each value's type is checked once; any
+        part of a document that doesn't match the schema, or nests deeper than COMPILE_MAX_DEPTH,
+        goes through the generic writer, so the result always equals
+        `(await format(doc, **options)).content` (no translation or token count).
+        Options: delimiter, indent, key_folding.
+
+        ```python
+        >>> write = fmt.compile({"name": "", "tags": []})
+        >>> write({"name": "Ann", "tags": ["a"]})
+        'name: Ann\\ntags[1]: a'
+        ```
+        """
+        delimiter: str = options.get("delimiter", ",")
+        indent: int = options.get("indent", 2)
+        key_folding: bool = bool(options.get("key_folding", False))
+
+        cache_key = (_schema_key(schema), delimiter, indent, key_folding)
+        fn = self._compiled.get(cache_key)
+        if fn is not None:
+            self._compiled.move_to_end(cache_key)
+            return fn
+
+        writers = self._writers(delimiter, indent, key_folding)
+        key_repr = writers["key_repr"]
+        lines: List[str] = []
+        counter = [0]
+
+        def _inlinable(node: Any) -> bool:
+            # a single-key dict may fold into a dotted key, leave that to the generic writer
+            return (
+                isinstance(node, dict)
+                and all(isinstance(k, str) for k in node)
+                and not (key_folding and len(node) == 1)
+            )
+
+        def _gen_dict(node: Dict[str, Any], var: str, level: int, pad: str) -> None:
+            sp = " " * (indent * level)
+            for k, child in node.items():
+                counter[0] += 1
+                v = f"v{counter[0]}"
+                kr = key_repr(k)
+                lines.append(f"{pad}{v} = {var}[{k!r}]")
+                generic = f"_emit_kv({k!r}, {kr!r}, {v}, {level}, out)"
+                if _inlinable(child) and level + 1 < self.COMPILE_MAX_DEPTH:
+                    lines.append(f"{pad}if type({v}) is dict and tuple({v}) == {tuple(child)!r}:")
+                    lines.append(f"{pad}    out.append({sp + kr + ':' + chr(10)!r})")
+                    _gen_dict(child, v, level + 1, pad + "    ")
+                elif type(child) in _LEAF_WRITERS:
+                    guard, render = _LEAF_WRITERS[type(child)]
+                    lines.append(f"{pad}if {guard.format(v=v)}:")
+                    lines.append(f"{pad}    out.append({sp + kr + ': '!r} + {render.format(v=v)} + '\\n')")
+                else:
+                    # lists and other values: the generic writer picks tabular/inline/item form
+                    lines.append(f"{pad}{generic}")
+                    continue
+                lines.append(f"{pad}else:")
+                lines.append(f"{pad}    {generic}")
+
+        lines.append("def _compiled(doc):")
+        lines.append("    out = []")
+        if _inlinable(schema):
+            lines.append(f"    if type(doc) is dict and tuple(doc) == {tuple(schema)!r}:")
+            if not schema:
+                lines.append("        pass")
+            _gen_dict(schema, "doc", 0, "        ")
+            lines.append("    else:")
+            lines.append("        _emit(doc, 0, None, out)")
+        else:
+            lines.append("    _emit(doc, 0, None, out)")
+        lines.append("    content = ''.join(out)")
+        lines.append("    return content[:-1] if content.endswith('\\n') else content")
+
+        namespace = {
+            "_emit": writers["emit"],
+            "_emit_kv": writers["emit_kv"],
+            "_esc": writers["escape"],
+            "_prim": writers["compact_primitive"],
+        }
+        exec(compile("\n".join(lines), "<toon-compiled>", "exec"), namespace)
+        fn = namespace["_compiled"]
 
-        # Build content
+        self._compiled[cache_key] = fn
+        if len(self._compiled) > self.COMPILE_CACHE_SIZE:
+            self._compiled.popitem(last=False)
+        return fn
+
+    def _render(
+        self, data: Any, delimiter: str, indent: int, key_folding: bool, strict_fallback: Optional[str]
+    ) -> str:
+        """TOON text of data (no trailing newline), applying strict_fallback if the structure is unsupported"""
+        writers = self._writers(delimiter, indent, key_folding)
         try:
-            content = _compact(data)
+            out: List[str] = []
+            writers["emit"](data, 0, None, out)
+            content = "".join(out)
+            if content.endswith("\n"):
+                content = content[:-1]
         except Exception as e:
             logger.exception(f"Failed to compact data to TOON: {e}")
             if strict_fallback == "json":
-                import json as _json
-
-                content = _json.dumps(data, ensure_ascii=False)
+                content = json_dumps(data)
             elif strict_fallback == "compact":
                 # simple compact feedback (single-line)
-                def _flat(o):
-                    if isinstance(o, dict):
-                        return ",".join(f"{k}:{_flat(v)}" for k, v in o.items())
-                    if isinstance(o, list):
-                        return "[" + ",".join(_flat(x) for x in 0) + "]"
-
-                    return str(o)
-
-                content = _flat(data)
+                out = []
+                writers["compact_oneline"](data, out)
+                content = "".join(out)
             else:
                 raise
 
-        # Handle Optional translation
+        return content
+
+    def format_bytes(self, data: Any, **options) -> bytes:
+        """
+        UTF-8 TOON bytes for raw JSON bytes, a JSON `ConversionInput` or parsed data,
+        for callers that read JSON from and write TOON back to the network.
+        Layout options and strict_fallback as in `format`; no translation or token count.
+        """
+        if isinstance(data, _RAW_TYPES):
+            data = _json_converter.parse(ConversionInput(data=data, format="json-bytes"))
+        elif isinstance(data, ConversionInput):
+            data = _parse_input(data)
+
+        content = self._render(
+            data,
+            options.get("delimiter", ","),
+            options.get("indent", 2),
+            bool(options.get("key_folding", False)),
+            options.get("strict_fallback", None),
+        )
+        return content.encode("utf-8")
+
+    async def format(self, data: Any, **options) -> ConversionOutput:
+        """
+        Format the normalized data into TOON
+        `data` may also be a JSON `ConversionInput` (text, bytes or parsed), which is parsed here.
+        Options:
+            - delimiter: str, default: ","
+            - indent: int spaces for nested levels (default: 2)
+            - key_folding: bool (default False)
+                * Fold single-key chains into dotted keys when safe
+            - translate_to / translate: Language or str (optional)
+            - translate_leaves: bool (default False)
+                * Translate string values only, before formatting, instead of the rendered TOON text.
+                  Keys and TOON syntax are never sent; leaves are deduplicated and coalesced into shared requests
+            - strict_fallback: "json" | "compact" | None - If structure unsupported, fallback behaviour
+            - approximate_tokens: bool (default False) - cheaper token_count, see `count_tokens`
+
+        ```python
+        >>> fmt = ToonFormater()
+        >>> out = await fmt.format(data, translate_to=Language.CHINESE)
+        ```
+        """
+        if isinstance(data, ConversionInput):
+            data = _parse_input(data)
+
+        delimiter: str = options.get("delimiter", ",")
+        indent: int = options.get("indent", 2)
+        key_folding: bool = bool(options.get("key_folding", False))
+        strict_fallback: Optional[str] = options.get("strict_fallback", None)
+        approximate_tokens: bool = bool(options.get("approximate_tokens", False))
+        translate_leaves: bool = bool(options.get("translate_leaves", False))
+
         translate_to = options.get("translate_to") or options.get("translate")
         if translate_to:
             if translate is None:
@@ -270,41 +621,55 @@ class ToonFormatter(BaseFormatter):
                 except ValueError:
                     pass
 
-            # chunking by characters to avoid huge requests
-            pieces: List[str] = []
-            text = content
-            if len(text) <= self.TRANSLATE_CHUNK_SIZE:
-                pieces = [text]
+        if translate_to and translate_leaves:
+            leaves: Dict[str, None] = {}
+            _collect_str_leaves(data, leaves)
+            if leaves:
+                # one list call: cache hits are served locally, misses go through the batch queue together
+                unique = list(leaves)
+                translated = await _translate_texts(unique, translate_to)
+                data = _replace_str_leaves(data, dict(zip(unique, translated)))
+
+        content = self._render(data, delimiter, indent, key_folding, strict_fallback)
+
+        # Handle Optional translation of the rendered text
+        if translate_to and not translate_leaves:
+            # chunking by size to avoid huge requests
+            chunk = self.TRANSLATE_CHUNK_SIZE
+            data_bytes = content.encode("utf-8")
+            n = len(data_bytes)
+            if n <= chunk:
+                pieces: List[str] = [content]
             else:
-                # naive chunk split on size but keep line integrity where possible
-                lines = text.splitlines(keepends=True)
-                cur = ""
-                for line in lines:
-                    if len(cur) + len(line) > self.TRANSLATE_CHUNK_SIZE and cur:
-                        pieces.append(cur)
-                        cur = line
-                    else:
-                        cur += line
-                if cur:
-                    pieces.append(cur)
-
-            translated_pieces: List[str] = []
-            for piece in pieces:
-                try:
-                    translated = await translate(piece, dest=translate_to)
-                    if isinstance(translated, list):
-                        translated_pieces.append(translated[0])
-                    else:
-                        translated_pieces.append(translated)
-                except Exception as e:
-                    logger.warning("Translation chunk failed; using untranslated chunk. Error: %s", e)
-                    translated_pieces.append(piece)
-            content = "".join(translated_pieces)
-
-        # token counting
+                # split on byte offsets over one buffer, keeping line integrity where possible
+                view = memoryview(data_bytes)
+                pieces = []
+                i = 0
+                while i < n:
+                    end = min(i + chunk, n)
+                    if end < n:
+                        nl = data_bytes.rfind(b"\n", i, end)
+                        if nl > i:
+                            end = nl + 1
+                        else:
+                            # no newline in the window: back off to a UTF-8 character boundary
+                            while end > i and (data_bytes[end] & 0xC0) == 0x80:
+                                end -= 1
+                            if end == i:
+                                # a single character wider than the window
+                                end = i + 1
+                                while end < n and (data_bytes[end] & 0xC0) == 0x80:
+                                    end += 1
+                    pieces.append(str(view[i:end], "utf-8"))
+                    i = end
+
+            # one call for all chunks, sent concurrently; a chunk that fails (after retries) stays untranslated
+            content = "".join(await _translate_texts(pieces, translate_to))
+
+        # token counting (tiktoken releases the GIL while encoding, so keep it off the event loop)
         tokens = None
         try:
-            tokens = count_tokens(content)
+            tokens = await asyncio.to_thread(count_tokens, content, approximate=approximate_tokens)
         except Exception:
             logger.exception("Token counting failed, leaving token_count as None")
 
@@ -0,0 +1,21 @@
+from typing import Any, Optional
+
+from tokeneff.core.models import ConversionInput, ConversionOutput
+from tokeneff.formatters.toon_formatter import ToonFormatter
+
+
+class JsonToToonPipeline:
+    """
+    JSON in, TOON out in one call: parse and format run back to back and the
+    parsed tree is dropped as soon as it has been written, instead of being held by the caller.
+    """
+
+    def __init__(self, formatter: Optional[ToonFormatter] = None):
+        self.formatter = formatter or ToonFormatter()
+
+    async def convert(self, raw: Any, **options) -> ConversionOutput:
+        """
+        Convert JSON text, UTF-8 bytes or already-parsed data to TOON.
+        Options are passed to `ToonFormatter.format` (e.g. translate_to=Language.CHINESE).
+        """
+        return await self.formatter.format(ConversionInput(data=raw, format="json"), **options)
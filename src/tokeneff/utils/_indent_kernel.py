@@ -0,0 +1,32 @@
+"""Numba kernel for `count_tokens(approximate=True)`; imported lazily since numba is optional"""
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def _collapse_indent(buf: np.ndarray) -> np.ndarray:
+    """Rewrite every run of >= 2 spaces following a newline into a single tab"""
+    n = buf.shape[0]
+    out = np.empty_like(buf)
+    i = 0
+    j = 0
+    while i < n:
+        c = buf[i]
+        out[j] = c
+        i += 1
+        j += 1
+        if c == 10:
+            k = i
+            while k < n and buf[k] == 32:
+                k += 1
+            if k - i >= 2:
+                out[j] = 9
+                j += 1
+                i = k
+
+    return out[:j]
+
+
+def collapse_indent(text: str) -> str:
+    buf = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    return _collapse_indent(buf).tobytes().decode("utf-8")
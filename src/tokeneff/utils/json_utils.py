@@ -0,0 +1,34 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(raw: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """Parse JSON text or raw UTF-8 bytes, using orjson when installed"""
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson rejects some inputs stdlib accepts (NaN/Infinity, >64-bit ints)
+            pass
+
+    if isinstance(raw, memoryview):
+        raw = raw.tobytes()
+    # No parse_int/parse_float hooks: custom hooks route every number through a Python call instead of the C scanner
+    return json.loads(raw)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize to compact JSON text (no whitespace, non-ASCII kept), using orjson when installed"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            # orjson.JSONEncodeError: non-str keys, >64-bit ints, ... let stdlib decide
+            pass
+
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
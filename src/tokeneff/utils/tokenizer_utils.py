@@ -1,11 +1,50 @@
+import re
+from functools import lru_cache
+from typing import Callable, Optional
+
 import tiktoken
 
+# Two or more spaces at the start of a line
+_INDENT_RE = re.compile(r"(?<=\n) {2,}")
+
 
-def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
-    """Count tokens using OpenAI's tokenizer"""
+@lru_cache(maxsize=8)
+def _get_encoder(model: str) -> tiktoken.Encoding:
+    """Resolve (once per model) the tiktoken encoding, falling back to cl100k_base"""
     try:
-        enc = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except KeyError:
-        enc = tiktoken.get_encoding("cl100k_base")
+        return tiktoken.get_encoding("cl100k_base")
+
+
+@lru_cache(maxsize=1)
+def _indent_kernel() -> Optional[Callable[[str], str]]:
+    """Numba indentation kernel, imported on the first approximate count; None without numba"""
+    try:
+        from tokeneff.utils._indent_kernel import collapse_indent
+    except ImportError:
+        return None
+
+    return collapse_indent
+
+
+def _normalize_indent(text: str) -> str:
+    """Collapse leading indentation runs so the tokenizer sees one tab per indented line"""
+    kernel = _indent_kernel()
+    if kernel is not None:
+        return kernel(text)
+
+    return _INDENT_RE.sub("\t", text)
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini", *, approximate: bool = False) -> int:
+    """
+    Count tokens using OpenAI's tokenizer
+
+    With `approximate=True` indentation is collapsed before encoding, which is cheaper
+    on deeply indented TOON output but counts each indented line's leading spaces as one tab.
+    """
+    if approximate:
+        text = _normalize_indent(text)
 
-    return len(enc.encode(text))
+    return len(_get_encoder(model).encode(text))
@@ -0,0 +1,10 @@
+import pytest_asyncio
+
+from tokeneff.core.translation.translation import translator
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def shared_translator():
+    """Shared translator on one session-wide event loop, so its connection pool survives across tests"""
+    yield translator
+    await translator.aclose()
@@ -159,3 +159,248 @@ def test_translation_not_used():
     out = run_async(ToonFormatter().format(normalized))
 
     assert "hello" in out.content  # raw unchanged
+
+
+# -----------------------------
+# 10. Key folding leaves single keys alone
+# -----------------------------
+def test_key_folding_single_key():
+    data = {"meta": {"count": 2, "user": {"id": 10}}}
+
+    normalized = JsonConverter().parse(ConversionInput(data=data, format="json"))
+    out = run_async(ToonFormatter().format(normalized, key_folding=True))
+
+    # no chain longer than one key, so nothing is folded
+    assert out.content == "meta:\n  count: 2\n  user:\n    id: 10"
+
+
+# -----------------------------
+# 11. Deeply nested dicts keep their indentation
+# -----------------------------
+def test_nested_json_indentation():
+    data = {
+        "meta": {
+            "user": {
+                "id": 10,
+                "active": True,
+                "tags": ["a", "b"],
+                "roles": [{"id": 1, "name": "admin"}],
+            }
+        },
+        "ok": False,
+    }
+
+    normalized = JsonConverter().parse(ConversionInput(data=data, format="json"))
+    out = run_async(ToonFormatter().format(normalized))
+
+    assert out.content == (
+        "meta:\n"
+        "  user:\n"
+        "    id: 10\n"
+        "    active: true\n"
+        "    tags[2]: a,b\n"
+        "    roles[1]{id,name}\n"
+        "      1,admin\n"
+        "ok: false"
+    )
+
+
+# -----------------------------
+# 12. Strict fallback: compact with lists
+# -----------------------------
+def test_strict_fallback_compact_list():
+    class Weird:
+        def __str__(self):
+            return "weird"
+
+    data = {"items": [1, Weird()], "meta": {"ok": True}}
+
+    normalized = JsonConverter().parse(ConversionInput(data=data, format="json"))
+    out = run_async(ToonFormatter().format(normalized, strict_fallback="compact"))
+
+    assert out.content == "items:[1,weird],meta:ok:True"
+
+
+# -----------------------------
+# 13. Float formatting
+# -----------------------------
+def test_float_primitives():
+    data = {"nums": [2.0, 1.5, float("nan"), float("inf")]}
+
+    normalized = JsonConverter().parse(ConversionInput(data=data, format="json"))
+    out = run_async(ToonFormatter().format(normalized))
+
+    assert out.content == "nums[4]: 2,1.5,null,null"
+
+
+# -----------------------------
+# 14. Raw JSON input: str and bytes
+# -----------------------------
+def test_parse_raw_json_bytes():
+    raw = '{"name": "Raghvender", "tags": ["a", "ü"], "n": 1.5}'
+    expected = {"name": "Raghvender", "tags": ["a", "ü"], "n": 1.5}
+
+    conv = JsonConverter()
+
+    assert conv.parse(ConversionInput(data=raw, format="json")) == expected
+    assert conv.parse(ConversionInput(data=raw.encode(), format="json-bytes")) == expected
+    assert conv.parse(ConversionInput(data=memoryview(raw.encode()), format="json-bytes")) == expected
+
+
+# -----------------------------
+# 15. Key rendering reused across calls and delimiters
+# -----------------------------
+def test_key_repr_per_delimiter():
+    fmt = ToonFormatter()
+    data = {"a,b": 1}
+
+    assert run_async(fmt.format(data)).content == '"a\\,b": 1'
+    assert run_async(fmt.format(data, delimiter="|")).content == "a,b: 1"
+    assert run_async(fmt.format(data)).content == '"a\\,b": 1'
+
+
+# -----------------------------
+# 16. String lists/columns: plain fast path vs quoted cells
+# -----------------------------
+def test_plain_and_quoted_string_cells():
+    fmt = ToonFormatter()
+
+    plain = {"tags": ["a", "b c", "d"]}
+    assert run_async(fmt.format(plain)).content == "tags[3]: a,b c,d"
+
+    mixed = {"tags": ["a", "x,y", "", " lead", "trail ", 'q"t']}
+    assert run_async(fmt.format(mixed)).content == (
+        'tags[6]: a,"x\\,y","",'
+        '" lead","trail ","q\\"t"'
+    )
+
+    rows = {"rows": [{"k": "a", "v": "ok"}, {"k": "b", "v": "x:y"}, {"k": "c", "v": ""}]}
+    assert run_async(fmt.format(rows)).content == (
+        "rows[3]{k,v}\n"
+        "  a,ok\n"
+        '  b,"x\\:y"\n'
+        '  c,""'
+    )
+
+
+# -----------------------------
+# 17. Translation chunking on UTF-8 byte offsets
+# -----------------------------
+@pytest.mark.parametrize("chunk_size", [4, 7, 16])
+def test_translation_chunks_split_on_char_boundaries(chunk_size, monkeypatch):
+    import tokeneff.formatters.toon_formatter as toon_formatter
+
+    sent = []
+
+    async def fake_translate(pieces, **kwargs):
+        sent.extend(pieces)
+        return list(pieces)
+
+    monkeypatch.setattr(toon_formatter, "translate", fake_translate)
+    monkeypatch.setattr(toon_formatter, "count_tokens", lambda text, **kwargs: len(text))
+
+    data = {"line": "abc", "wide": "你好世界ü€😀xyz" * 3, "rows": ["短", "éé", "plain text"]}
+    fmt = ToonFormatter()
+    expected = run_async(fmt.format(data)).content
+
+    fmt.TRANSLATE_CHUNK_SIZE = chunk_size
+    out = run_async(fmt.format(data, translate_to="chinese"))
+
+    assert out.content == expected
+    assert len(sent) > 1
+    assert "".join(sent) == expected
+    # every piece is whole characters (str) and fits the byte budget
+    assert all(len(p.encode("utf-8")) <= chunk_size for p in sent)
+
+
+# -----------------------------
+# 18. One-step JSON -> TOON
+# -----------------------------
+def test_json_to_toon_pipeline():
+    from tokeneff.pipeline import JsonToToonPipeline
+
+    raw = '{"name": "John", "tags": ["a", "b"]}'
+    expected = "name: John\ntags[2]: a,b"
+    pipeline = JsonToToonPipeline()
+
+    assert run_async(pipeline.convert(raw)).content == expected
+    assert run_async(pipeline.convert(raw.encode())).content == expected
+    assert run_async(ToonFormatter().format(ConversionInput(data=raw, format="json"))).content == expected
+
+    with pytest.raises(ValueError):
+        run_async(ToonFormatter().format(ConversionInput(data="a,b", format="csv")))
+
+
+# -----------------------------
+# 19. Leaf-level translation keeps keys and TOON syntax
+# -----------------------------
+def test_translate_leaves(monkeypatch):
+    import tokeneff.formatters.toon_formatter as toon_formatter
+
+    calls = []
+
+    async def fake_translate(texts, dest=None, **kwargs):
+        calls.append(list(texts))
+        return [t.upper() for t in texts]
+
+    monkeypatch.setattr(toon_formatter, "translate", fake_translate)
+    monkeypatch.setattr(toon_formatter, "count_tokens", lambda text, **kwargs: len(text))
+
+    data = {"name": "ann", "tags": ["x", "ann"], "rows": [{"role": "dev, ops"}, {"role": "x"}], "n": 1}
+    out = run_async(ToonFormatter().format(data, translate_to="french", translate_leaves=True))
+
+    assert out.content == (
+        "name: ANN\n"
+        "tags[2]: X,ANN\n"
+        "rows[2]{role}\n"
+        '  "DEV\\, OPS"\n'
+        "  X\n"
+        "n: 1"
+    )
+    # unique values only, one call
+    assert calls == [["ann", "x", "dev, ops"]]
+
+
+# -----------------------------
+# 20. Schema-compiled writer matches format()
+# -----------------------------
+def test_compiled_writer_matches_format():
+    fmt = ToonFormatter()
+    schema = {"name": "", "meta": {"id": 0, "ok": True, "x y": None}, "tags": [], "score": 1.5}
+    write = fmt.compile(schema)
+
+    docs = [
+        {"name": "Ann", "meta": {"id": 3, "ok": False, "x y": None}, "tags": ["a", "b"], "score": 2.0},
+        # schema misses: changed leaf types, different nested keys, different top-level keys
+        {"name": ["n"], "meta": {"id": "3", "ok": 1, "x y": "v"}, "tags": [{"k": 1}], "score": None},
+        {"name": "Ann", "meta": {"other": 1}, "tags": [], "score": 1.5},
+        {"only": "this"},
+        [1, 2],
+    ]
+    for doc in docs:
+        assert write(doc) == run_async(fmt.format(doc)).content
+
+    assert fmt.compile(schema) is write
+    assert fmt.compile(schema, delimiter="|") is not write
+
+
+def test_compiled_writer_deep_schema():
+    fmt = ToonFormatter()
+    schema = {"v": 1}
+    for i in range(120):
+        schema = {f"k{i}": schema, "n": i}
+    write = fmt.compile(schema)
+    assert write(schema) == run_async(fmt.format(schema)).content
+
+
+# -----------------------------
+# 21. Bytes in, bytes out
+# -----------------------------
+def test_format_bytes():
+    raw = '{"name": "Jöhn", "rows": [{"id": 1, "v": "a:b"}]}'.encode()
+    fmt = ToonFormatter()
+    expected = run_async(fmt.format(ConversionInput(data=raw, format="json-bytes"))).content
+
+    assert fmt.format_bytes(raw) == expected.encode("utf-8")
+    assert fmt.format_bytes(memoryview(raw)) == expected.encode("utf-8")
+    assert fmt.format_bytes({"x": [1, 2]}, delimiter="|") == b"x[2]: 1|2"
@@ -0,0 +1,31 @@
+import pytest
+
+from tokeneff.utils import tokenizer_utils
+from tokeneff.utils.tokenizer_utils import _normalize_indent
+
+# (text, text with each indentation run after a newline collapsed to a tab)
+SAMPLES = [
+    ("", ""),
+    ("flat", "flat"),
+    ("  first line keeps its spaces", "  first line keeps its spaces"),
+    ("a:\n  b: 1\n    c: 2\n d: 3", "a:\n\tb: 1\n\tc: 2\n d: 3"),
+    ("rows[2]{id,name}\n  1,ü\n  2,你好\n", "rows[2]{id,name}\n\t1,ü\n\t2,你好\n"),
+    ("trailing\n   ", "trailing\n\t"),
+    ("\n\n    \n  x", "\n\n\t\n\tx"),
+]
+
+
+@pytest.mark.parametrize("text, expected", SAMPLES)
+def test_normalize_indent_regex(text, expected, monkeypatch):
+    monkeypatch.setattr(tokenizer_utils, "_indent_kernel", lambda: None)
+    assert _normalize_indent(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", SAMPLES)
+def test_normalize_indent_numba(text, expected):
+    kernel = pytest.importorskip("tokeneff.utils._indent_kernel")
+    assert kernel.collapse_indent(text) == expected
+
+
+def test_normalize_indent_collapses_to_tabs():
+    assert _normalize_indent("a:\n  b: 1\n    c: 2") == "a:\n\tb: 1\n\tc: 2"
@@ -0,0 +1,388 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from tokeneff.core.translation import translation
+from tokeneff.core.translation.translation import (
+    CONCURRENCY_ENV,
+    DISK_CACHE_ENV,
+    Translator,
+    _needs_translation,
+    translate,
+)
+
+
+class FakeBackend:
+    """Stands in for googletrans: tags each text with the destination and records calls"""
+
+    def __init__(self):
+        self.calls = []
+        self.client = SimpleNamespace(aclose=self._aclose)
+
+    async def _aclose(self):
+        pass
+
+    async def translate(self, text, src, dest):
+        self.calls.append(text)
+        await asyncio.sleep(0)
+        return SimpleNamespace(text="\n".join(f"<{dest}>{line}" for line in text.split("\n")))
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    fake = FakeBackend()
+    monkeypatch.setattr(translation, "_create_backend", lambda: fake)
+    monkeypatch.delenv(DISK_CACHE_ENV, raising=False)
+    translate.cache_clear()
+    yield fake
+    translate.cache_clear()
+
+
+# -----------------------------
+# 1. Strings translation cannot change
+# -----------------------------
+@pytest.mark.parametrize("text", ["", "42", "3.14", "--", "https://example.com/a?b=1"])
+def test_needs_translation_skips_letterless_and_urls(text):
+    assert not _needs_translation(text, "zh-cn")
+
+
+def test_needs_translation_keep():
+    assert not _needs_translation("Raghvender", "zh-cn", keep={"Raghvender"})
+    assert _needs_translation("Engineer", "zh-cn", keep={"Raghvender"})
+
+
+# -----------------------------
+# 2. Shared scripts still translate, dest-only scripts don't
+# -----------------------------
+@pytest.mark.parametrize(
+    "text, dest",
+    [
+        ("繁體中文", "zh-cn"),
+        ("我们明天见", "ja"),
+        ("Привіт", "ru"),
+        ("سلام دنیا", "ar"),
+        ("तुम्ही कसे आहात", "hi"),
+        ("ML Engineer", "fr"),
+    ],
+)
+def test_needs_translation_shared_script(text, dest):
+    assert _needs_translation(text, dest)
+
+
+def test_needs_translation_hangul_to_korean():
+    assert not _needs_translation("안녕하세요 123", "ko")
+    assert _needs_translation("안녕하세요 hello", "ko")
+
+
+# -----------------------------
+# 3. Concurrency limit validation
+# -----------------------------
+def test_concurrency_env_parsed_lazily(monkeypatch):
+    t = Translator()
+    monkeypatch.delenv(CONCURRENCY_ENV, raising=False)
+    assert t.max_concurrency == 8
+
+    monkeypatch.setenv(CONCURRENCY_ENV, "3")
+    assert t.max_concurrency == 3
+
+    for bad in ("abc", "0", "-2"):
+        monkeypatch.setenv(CONCURRENCY_ENV, bad)
+        with pytest.raises(ValueError, match=CONCURRENCY_ENV):
+            t.max_concurrency
+
+
+def test_concurrency_argument_validated():
+    assert Translator(max_concurrency=2).max_concurrency == 2
+    with pytest.raises(ValueError):
+        Translator(max_concurrency=0)
+
+
+# -----------------------------
+# 4. Cache hits, in-flight sharing and cache_clear
+# -----------------------------
+def test_translate_cache_and_inflight(backend):
+    async def run():
+        # identical concurrent misses share one request
+        first = await asyncio.gather(translate("hello", dest="fr"), translate("hello", dest="fr"))
+        again = await translate("hello", dest="fr")
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert first == ["<fr>hello", "<fr>hello"]
+    assert again == "<fr>hello"
+    assert backend.calls == ["hello"]
+
+    translate.cache_clear()
+    assert asyncio.run(translate("hello", dest="fr")) == "<fr>hello"
+    assert backend.calls == ["hello", "hello"]
+
+
+def test_unchanged_translation_cached(backend, monkeypatch):
+    # a successful response equal to the input (names, loanwords) is a real result
+    async def echo(text, src, dest):
+        backend.calls.append(text)
+        return SimpleNamespace(text=text)
+
+    monkeypatch.setattr(backend, "translate", echo)
+    assert asyncio.run(translate("Tokyo", dest="fr")) == "Tokyo"
+    assert asyncio.run(translate("Tokyo", dest="fr")) == "Tokyo"
+    assert backend.calls == ["Tokyo"]
+
+
+def test_translate_list_input(backend):
+    out = asyncio.run(translate(["one", "42"], dest="fr"))
+    assert out == ["<fr>one", "42"]
+    assert asyncio.run(translate(["one"], dest="fr")) == ["<fr>one"]
+
+
+# -----------------------------
+# 5. Disk cache: opt-in and merged on save
+# -----------------------------
+def test_disk_cache_off_by_default(backend, monkeypatch):
+    assert translation._disk_cache_path() is None
+    monkeypatch.setenv(DISK_CACHE_ENV, "0")
+    assert translation._disk_cache_path() is None
+
+
+def test_disk_cache_survives_cache_clear(backend, monkeypatch, tmp_path):
+    path = tmp_path / "translations.json"
+    monkeypatch.setenv(DISK_CACHE_ENV, str(path))
+
+    asyncio.run(translate("cat", dest="fr"))
+    translation._save_disk_cache()
+
+    # a cleared cache must not overwrite what is already on disk
+    translate.cache_clear()
+    asyncio.run(translate("dog", dest="fr"))
+    translation._save_disk_cache()
+    assert sorted(e[3] for e in json.loads(path.read_text(encoding="utf-8"))) == ["<fr>cat", "<fr>dog"]
+
+    # a fresh process loads it back without requests
+    translate.cache_clear()
+    monkeypatch.setattr(translation, "_disk_loaded", False)
+    calls = len(backend.calls)
+    assert asyncio.run(translate("cat", dest="fr")) == "<fr>cat"
+    assert len(backend.calls) == calls
+
+
+def test_disk_cache_skips_malformed_entries(backend, monkeypatch, tmp_path):
+    path = tmp_path / "translations.json"
+    monkeypatch.setenv(DISK_CACHE_ENV, str(path))
+    good = ["ab" * 16, "auto", "fr", "<fr>x"]
+    path.write_text(json.dumps([[["x"], "auto", "fr", "v"], ["zz", "auto", "fr", "v"], [1, 2], good]))
+
+    translate.cache_clear()
+    monkeypatch.setattr(translation, "_disk_loaded", False)
+    translation._load_disk_cache()
+    assert translation._TRANSLATE_CACHE[(bytes.fromhex(good[0]), "auto", "fr")] == "<fr>x"
+
+    asyncio.run(translate("cat", dest="fr"))
+    translation._save_disk_cache()
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved[0] == good
+    assert [e[3] for e in saved] == ["<fr>x", "<fr>cat"]
+
+
+# -----------------------------
+# 6. Batch queue: coalescing and fallbacks
+# -----------------------------
+def test_batch_queue_coalesces_concurrent_misses(backend):
+    out = asyncio.run(translate(["one", "two", "three"], dest="fr"))
+
+    assert out == ["<fr>one", "<fr>two", "<fr>three"]
+    assert backend.calls == ["one\ntwo\nthree"]
+
+
+def test_batch_queue_sends_multiline_text_directly(backend):
+    out = asyncio.run(translate(["a\nb", "c"], dest="fr"))
+
+    assert out == ["<fr>a\n<fr>b", "<fr>c"]
+    assert sorted(backend.calls) == ["a\nb", "c"]
+
+
+def test_batch_queue_split_mismatch_falls_back(backend, monkeypatch):
+    async def flatten(text, src, dest):
+        backend.calls.append(text)
+        return SimpleNamespace(text=f"<{dest}>" + text.replace("\n", " "))
+
+    monkeypatch.setattr(backend, "translate", flatten)
+    out = asyncio.run(translate(["one", "two"], dest="fr"))
+
+    assert out == ["<fr>one", "<fr>two"]
+    assert backend.calls[0] == "one\ntwo"
+    assert sorted(backend.calls[1:]) == ["one", "two"]
+
+
+def test_batch_queue_per_item_exceptions(backend, monkeypatch):
+    monkeypatch.setattr(backend, "translate", _fail_on(backend, "bad"))
+
+    async def run():
+        return await asyncio.gather(
+            translation._batch_queue.submit("good", "auto", "fr"),
+            translation._batch_queue.submit("bad", "auto", "fr"),
+            return_exceptions=True,
+        )
+
+    good, bad = asyncio.run(run())
+    assert good == "<fr>good"
+    assert isinstance(bad, RuntimeError)
+
+
+def test_batch_queue_failed_batch_not_resent(backend, monkeypatch):
+    async def down(text, src, dest):
+        backend.calls.append(text)
+        raise RuntimeError("down")
+
+    monkeypatch.setattr(backend, "translate", down)
+
+    async def run():
+        return await asyncio.gather(
+            *(translation._batch_queue.submit(t, "auto", "fr") for t in ("a", "b", "c")),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    # one joined request, no per-item retries on top
+    assert backend.calls == ["a\nb\nc"]
+
+
+def test_batch_queue_new_event_loop(backend):
+    # queue, worker and semaphore are rebuilt for each loop
+    assert asyncio.run(translate("first", dest="fr")) == "<fr>first"
+    assert asyncio.run(translate("second", dest="fr")) == "<fr>second"
+    assert backend.calls == ["first", "second"]
+
+
+# -----------------------------
+# 7. Destination resolution
+# -----------------------------
+def test_dest_code_resolution():
+    from tokeneff.core.translation.languages import Language
+
+    assert translation._dest_code(Language.KOREAN) == "ko"
+    assert translation._dest_code("chinese") == "zh-cn"
+    assert translation._dest_code("Portuguese") == "pt"
+    assert translation._dest_code("sv") == "sv"
+
+
+# -----------------------------
+# 8. Responses that aren't valid UTF-8
+# -----------------------------
+def test_invalid_utf8_response_rejected(backend, monkeypatch):
+    async def surrogate(text, src, dest):
+        return SimpleNamespace(text="bad \ud800")
+
+    monkeypatch.setattr(backend, "translate", surrogate)
+
+    assert asyncio.run(translate("hello", dest="fr")) == "hello"
+    with pytest.raises(ValueError, match="UTF-8"):
+        asyncio.run(translate("hello", dest="fr", raise_on_error=True))
+    assert translation._cache_get(translation._cache_key("hello", "auto", "fr")) is None
+
+
+def test_valid_utf8():
+    assert translation._valid_utf8("plain")
+    assert translation._valid_utf8("你好 ü 😀")
+    assert not translation._valid_utf8("x\udfff")
+
+
+# -----------------------------
+# 9. Retries with backoff
+# -----------------------------
+def _response(text, status):
+    return SimpleNamespace(text=text, _response=SimpleNamespace(status_code=status))
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(translation, "_retry_delay", lambda attempt: 0)
+
+
+def test_retry_transient_failures(backend, monkeypatch, no_backoff):
+    httpx = pytest.importorskip("httpx")
+    outcomes = [httpx.ConnectError("down"), _response("hello", 503), _response("<fr>hello", 200)]
+
+    async def flaky(text, src, dest):
+        backend.calls.append(text)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(backend, "translate", flaky)
+
+    assert asyncio.run(translate("hello", dest="fr", raise_on_error=True)) == "<fr>hello"
+    assert backend.calls == ["hello"] * 3
+
+
+def test_retry_gives_up(backend, monkeypatch, no_backoff):
+    async def always(text, src, dest):
+        backend.calls.append(text)
+        return _response(text, 429 if text == "busy" else 403)
+
+    monkeypatch.setattr(backend, "translate", always)
+
+    with pytest.raises(RuntimeError, match="HTTP 429"):
+        asyncio.run(translate("busy", dest="fr", raise_on_error=True))
+    assert backend.calls == ["busy"] * translation.RETRY_ATTEMPTS
+
+    # client errors are not retried
+    assert asyncio.run(translate("denied", dest="fr")) == "denied"
+    assert backend.calls.count("denied") == 1
+
+
+def test_retry_delay_bounded():
+    delays = [translation._retry_delay(a) for a in range(8)]
+    assert all(0 < d <= translation.RETRY_MAX_DELAY + translation.RETRY_JITTER for d in delays)
+
+
+# -----------------------------
+# 10. One failing string doesn't discard the others
+# -----------------------------
+def _fail_on(backend, word):
+    async def partial(text, src, dest):
+        backend.calls.append(text)
+        if "\n" in text:
+            # joined batch comes back unsplittable, forcing per-item requests
+            return SimpleNamespace(text=text.replace("\n", " "))
+        if text == word:
+            raise RuntimeError("boom")
+        return SimpleNamespace(text=f"<{dest}>{text}")
+
+    return partial
+
+
+def test_translate_keeps_successes_when_one_fails(backend, monkeypatch):
+    monkeypatch.setattr(backend, "translate", _fail_on(backend, "FAIL"))
+
+    assert asyncio.run(translate(["hi", "FAIL"], dest="fr")) == ["<fr>hi", "FAIL"]
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(translate(["other", "FAIL"], dest="fr", raise_on_error=True))
+
+
+def test_translate_leaves_one_failing_leaf(backend, monkeypatch):
+    import tokeneff.formatters.toon_formatter as toon_formatter
+    from tokeneff.formatters.toon_formatter import ToonFormatter
+
+    monkeypatch.setattr(backend, "translate", _fail_on(backend, "FAIL"))
+    monkeypatch.setattr(toon_formatter, "count_tokens", lambda text, **kwargs: len(text))
+
+    out = asyncio.run(ToonFormatter().format({"a": "hi", "b": "FAIL"}, translate_to="french", translate_leaves=True))
+    assert out.content == "a: <fr>hi\nb: FAIL"
+
+
+def test_translate_leaves_without_backend(backend, monkeypatch):
+    import tokeneff.formatters.toon_formatter as toon_formatter
+    from tokeneff.formatters.toon_formatter import ToonFormatter
+
+    def missing():
+        raise RuntimeError("googletrans library is not available")
+
+    monkeypatch.setattr(translation, "_create_backend", missing)
+    monkeypatch.setattr(toon_formatter, "count_tokens", lambda text, **kwargs: len(text))
+
+    out = asyncio.run(ToonFormatter().format({"a": "hi"}, translate_to="french", translate_leaves=True))
+    assert out.content == "a: hi"
@@ -1,11 +1,13 @@
 import asyncio
-from tokeneff.core.translation.translation import translate
+from tokeneff.core.translation.translation import translate, translator
 from tokeneff.core.translation.languages import Language
 
 
 async def main():
     text = "Hello, how are you?"
-    translated = await translate(text, dest=Language.CHINESE)
+    # close the shared connection pool when done
+    async with translator:
+        translated = await translate(text, dest=Language.CHINESE)
     print(translated)
 
 